@@ -4,9 +4,7 @@ Command-line interface for 3D Modeler Pro
 """
 
 import sys
-import json
 import argparse
-from modeler import ModelerPro
 
 
 def main():
@@ -45,22 +43,27 @@ Examples:
     
     args = parser.parse_args()
     
+    # Imported after argument parsing so --help and usage errors stay fast
+    from modeler import ModelerPro
+    from schema import validate_json_structure
+    
     # Generate scene
     try:
         modeler = ModelerPro()
-        result = modeler.generate(args.prompt)
+        result = modeler.generate(args.prompt, pretty=args.pretty)
         
-        # Parse to validate
+        # Validate the generated scene rather than re-parsing its JSON
         if args.validate:
-            data = json.loads(result)
+            scene = modeler.schema
+            valid, errors = validate_json_structure(scene.to_dict())
+            if not valid:
+                print("✗ Invalid scene generated", file=sys.stderr)
+                for error in errors:
+                    print(f"  - {error}", file=sys.stderr)
+                return 1
             print(f"✓ Valid JSON generated", file=sys.stderr)
-            print(f"  - Rooms: {len(data['rooms'])}", file=sys.stderr)
-            print(f"  - Confidence: {data['meta']['confidence']:.2f}", file=sys.stderr)
-        
-        # Format output
-        if args.pretty:
-            data = json.loads(result)
-            result = json.dumps(data, indent=2, ensure_ascii=False)
+            print(f"  - Rooms: {len(scene.rooms)}", file=sys.stderr)
+            print(f"  - Confidence: {scene.meta.confidence:.2f}", file=sys.stderr)
         
         # Write output
         if args.output:
@@ -9,21 +9,21 @@ def main():
     
     # Example 1: Simple apartment
     prompt1 = "A 2-bedroom apartment with modern kitchen"
-    result1 = modeler.generate(prompt1)
+    result1 = modeler.generate(prompt1, pretty=True)
     print("Example 1: 2-bedroom apartment")
     print(result1)
     print("\n" + "="*80 + "\n")
     
     # Example 2: Scandinavian style
     prompt2 = "A scandinavian 1-bedroom apartment, 60 square meters"
-    result2 = modeler.generate(prompt2)
+    result2 = modeler.generate(prompt2, pretty=True)
     print("Example 2: Scandinavian apartment")
     print(result2)
     print("\n" + "="*80 + "\n")
     
     # Example 3: Industrial loft
     prompt3 = "An industrial loft with living room and bathroom"
-    result3 = modeler.generate(prompt3)
+    result3 = modeler.generate(prompt3, pretty=True)
     print("Example 3: Industrial loft")
     print(result3)
 
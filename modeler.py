@@ -3,172 +3,446 @@
 Converts natural language descriptions into structured architectural scene JSON.
 """
 
+import copy
 import json
+import os
 import re
-from typing import Dict, List, Any, Optional
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Tuple
 from schema import (
-    SceneSchema, Meta, House, Level, Room, RoomBounds, Wall, Opening,
-    Furniture, Styles, Constraints, Exports, RoomType, PrivacyLevel
+    SceneSchema, Level, Room, RoomBounds, Opening, Furniture,
+    RoomType, PrivacyLevel, Theme, WallTable
 )
 
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+
+# Word to number mapping for counts like "two bedroom"
+_WORD_NUMS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
+}
+
+# Room keywords (and their plurals) mapped to the room type they create
+_ROOM_KEYWORDS = {
+    "bedroom": RoomType.BEDROOM, "bedrooms": RoomType.BEDROOM,
+    "bed": RoomType.BEDROOM, "beds": RoomType.BEDROOM,
+    "bathroom": RoomType.BATHROOM, "bathrooms": RoomType.BATHROOM,
+    "bath": RoomType.BATHROOM, "baths": RoomType.BATHROOM,
+    "kitchen": RoomType.KITCHEN, "kitchens": RoomType.KITCHEN,
+    "living": RoomType.LIVING,
+    "lounge": RoomType.LIVING, "lounges": RoomType.LIVING,
+}
+
+# Keywords that can carry a count, in precedence order: "2 bed 3 bedrooms"
+# takes its count from "bedroom"
+_COUNT_KINDS = {
+    RoomType.BEDROOM: ("bedroom", "bed"),
+    RoomType.BATHROOM: ("bathroom", "bath"),
+}
+
+# Style themes in priority order when a prompt mentions several
+_THEMES = (Theme.SCANDINAVIAN, Theme.INDUSTRIAL, Theme.MINIMALIST, Theme.RUSTIC)
+_THEME_KEYWORDS = {theme.value: theme for theme in _THEMES}
+
+# Every whole-word keyword the parser looks for; ids index into _KEYWORD_LIST
+_KEYWORD_LIST = tuple(_ROOM_KEYWORDS) + tuple(_THEME_KEYWORDS)
+_KEYWORDS = frozenset(_KEYWORD_LIST)
+
+_WORD_RE = re.compile(r'[a-z]+')
+
+# Features that need context around the keyword, matched in a single pass:
+# counted rooms ("2-bedroom", "two bedroom", "3 beds") and floor area ("60 sqm").
+# Number words and room kinds must be whole words, like the keyword scan.
+# The leading lookahead skips positions that can't start a number.
+_COUNT_AREA_RE = re.compile(
+    r'(?=[\d' + ''.join(sorted({word[0] for word in _WORD_NUMS})) + r'])(?:'
+    r'(?P<num>\d+|\b(?:' + '|'.join(_WORD_NUMS) + r')\b)[\s-]*'
+    r'(?P<kind>bedroom|bathroom|bed|bath)s?\b'
+    r'|(?P<area>\d+)\s*(?:sqm|m2|square\s*meters?))'
+)
+
+
+# Furniture placed in each room type: (type, preset, position relative to room origin)
+_FURNITURE_PRESETS: Dict[RoomType, Tuple[Tuple[str, str, Tuple[float, float]], ...]] = {
+    RoomType.BEDROOM: (
+        ("bed", "modern_bed_01", (1.5, 2.0)),
+        ("wardrobe", "wardrobe_modern_01", (0.5, 1.0)),
+    ),
+    RoomType.KITCHEN: (
+        ("kitchen_cabinet", "kitchen_cabinet_modern_01", (2.0, 0.5)),
+        ("refrigerator", "fridge_standard_01", (0.5, 0.6)),
+    ),
+    RoomType.LIVING: (
+        ("sofa", "modern_sofa_01", (2.0, 1.0)),
+        ("coffee_table", "coffee_table_modern_01", (1.5, 0.8)),
+    ),
+    RoomType.BATHROOM: (
+        ("toilet", "toilet_standard_01", (0.5, 0.4)),
+        ("sink", "sink_modern_01", (1.0, 0.5)),
+    ),
+}
+
+_BASE_MATERIALS = {
+    "walls": "paint_white_matte",
+    "floor_living": "wood_oak_light",
+    "floor_bedroom": "wood_oak_light",
+    "floor_kitchen": "tile_ceramic_gray",
+    "floor_bathroom": "tile_ceramic_gray",
+}
+
+_STYLE_MATERIAL_OVERRIDES = {
+    Theme.SCANDINAVIAN: {"walls": "paint_white_matte", "floor_living": "wood_oak_light"},
+    Theme.INDUSTRIAL: {"walls": "concrete_exposed", "floor_living": "concrete_polished"},
+    Theme.RUSTIC: {"walls": "wood_panel_natural", "floor_living": "wood_dark_oak"},
+}
+
+# Complete, read-only material set per theme, shared by every generated scene
+_MATERIALS_BY_THEME = {
+    theme: MappingProxyType({**_BASE_MATERIALS, **_STYLE_MATERIAL_OVERRIDES.get(theme, {})})
+    for theme in Theme
+}
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Convert schema values orjson doesn't handle natively."""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    if isinstance(obj, WallTable):
+        return obj.to_list()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _layout_kernel(area: float, n_rooms: int, aspect_ratio: float):
+    """
+    Numeric core of the floor plan: footprint width and depth, per-room area
+    and depth, and the x offset of each room placed side by side.
+    """
+    width = (area / aspect_ratio) ** 0.5
+    depth = area / width
+    room_area = area / n_rooms
+    room_depth = room_area / width
+    xs = [0.0] * n_rooms
+    x = 0.0
+    for i in range(n_rooms):
+        xs[i] = x
+        x += width
+    return width, depth, room_area, room_depth, xs
+
+
+_layout_impl = None
+
+
+def _resolve_layout(use_numba: bool):
+    """Return the layout kernel, compiled with numba if requested and installed."""
+    if use_numba:
+        try:
+            from numba import njit
+        except ImportError:  # Optional: run the layout math as plain Python
+            pass
+        else:
+            return njit(cache=True)(_layout_kernel)
+    return _layout_kernel
+
+
+def _layout(area: float, n_rooms: int, aspect_ratio: float):
+    """
+    Run the layout kernel, compiled with numba only when MODELER_NUMBA=1.
+    
+    numba is opt-in for long batch runs: importing and compiling it costs
+    close to a second per process, while the compiled kernel saves well under
+    a microsecond per call, so CLI runs and servers use plain Python.
+    """
+    global _layout_impl
+    if _layout_impl is None:
+        _layout_impl = _resolve_layout(os.environ.get("MODELER_NUMBA") == "1")
+    return _layout_impl(area, n_rooms, aspect_ratio)
+
+
+_keyword_db = None
+_keyword_db_lock = threading.Lock()
+# Scan scratch space can't be shared by concurrent scans, so each thread
+# allocates its own from the database on first use
+_keyword_scratch = threading.local()
+
+
+def _load_keyword_db():
+    """
+    Compile the keyword database with hyperscan, or return False when it
+    isn't installed. Each keyword must be bounded by non-letters, matching
+    the whole-word semantics of the token fallback. Only compiling is locked.
+    """
+    global _keyword_db
+    with _keyword_db_lock:
+        if _keyword_db is None:
+            try:
+                import hyperscan
+            except ImportError:  # Optional: fall back to tokenizing with re
+                _keyword_db = False
+            else:
+                db = hyperscan.Database()
+                db.compile(
+                    expressions=[
+                        b'(?:^|[^a-z])' + keyword.encode() + b'(?:[^a-z]|$)'
+                        for keyword in _KEYWORD_LIST
+                    ],
+                    ids=list(range(len(_KEYWORD_LIST))),
+                    elements=len(_KEYWORD_LIST),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(_KEYWORD_LIST),
+                )
+                _keyword_db = db
+    return _keyword_db
+
+
+def _on_keyword(keyword_id, start, end, flags, context):
+    context.add(_KEYWORD_LIST[keyword_id])
+
+
+def _find_keywords(text: str) -> set:
+    """Room and style keywords that appear as whole words in lowercase text."""
+    db = _keyword_db if _keyword_db is not None else _load_keyword_db()
+    if db:
+        scratch = getattr(_keyword_scratch, "scratch", None)
+        if scratch is None:
+            import hyperscan
+            scratch = _keyword_scratch.scratch = hyperscan.Scratch(db)
+        found = set()
+        db.scan(text.encode(), match_event_handler=_on_keyword, context=found,
+                scratch=scratch)
+        return found
+    return _KEYWORDS.intersection(_WORD_RE.findall(text))
+
+
+def _copy_scene(scene: SceneSchema) -> SceneSchema:
+    """Deep copy a scene, keeping its read-only material mapping shared."""
+    return copy.deepcopy(scene, {id(scene.materials): scene.materials})
+
+
+# Number of generated scenes kept in the shared prompt cache
+_CACHE_SIZE = 1024
+
+# Upper bound on rooms of one type, so a prompt like "100000 bedrooms"
+# can't produce (and cache) a scene of hundreds of megabytes
+_MAX_ROOMS_PER_TYPE = 20
+
+# Upper bound on the floor area read from a prompt; larger values (including
+# digit runs that overflow to inf) are clamped so every dimension stays finite
+_MAX_AREA_M2 = 100000.0
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Lowercase a prompt and collapse whitespace runs, which parsing ignores."""
+    return " ".join(prompt.lower().split())
+
 
 class ModelerPro:
     """
     Main engine for generating architectural scene JSON from natural language.
     """
     
+    # Generated (schema, json) pairs keyed by normalized prompt and output
+    # format, shared by all instances so repeated prompts skip the pipeline
+    _cache: "OrderedDict[Tuple[str, bool], Tuple[SceneSchema, str]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    
     def __init__(self):
-        self.schema = SceneSchema()
         self._initialize_defaults()
     
+    @property
+    def schema(self) -> SceneSchema:
+        """
+        The scene from the last generate() call.
+        
+        Cacheable results share their scene with the prompt cache, so the first
+        access afterwards takes a private copy the caller is free to modify.
+        """
+        if self._schema_shared:
+            self._schema = _copy_scene(self._schema)
+            self._schema_shared = False
+        return self._schema
+    
+    @schema.setter
+    def schema(self, scene: SceneSchema):
+        self._schema = scene
+        self._schema_shared = False
+    
     def _initialize_defaults(self):
         """Set up default scene structure."""
-        self.schema.meta = Meta()
-        self.schema.house = House()
+        # Always a new schema: the previous one may be held by the cache
+        self.schema = SceneSchema()
         self.schema.levels = [Level()]
-        self.schema.rooms = []
-        self.schema.walls = []
-        self.schema.openings = []
-        self.schema.furniture = []
-        self.schema.materials = {}
-        self.schema.styles = Styles()
-        self.schema.constraints = Constraints()
-        self.schema.exports = Exports()
     
-    def generate(self, prompt: str, **kwargs) -> str:
+    @classmethod
+    def clear_cache(cls):
+        """Drop all cached scenes."""
+        with cls._cache_lock:
+            cls._cache.clear()
+    
+    def generate(self, prompt: str, pretty: bool = False, **kwargs) -> str:
         """
         Generate architectural scene JSON from natural language prompt.
         
         Args:
             prompt: Natural language description of the space
+            pretty: Indent the JSON output instead of emitting it compact
             **kwargs: Additional parameters (style, constraints, etc.)
         
         Returns:
             Valid JSON string (no markdown, no comments)
+        
+        Results for prompts without extra parameters are cached; ``self.schema``
+        then copies the cached scene on first access, so the cache is never
+        changed through it.
         """
+        # Parsing works on the normalized text, so the prompt is lowercased
+        # once and shared between the cache key and the parser
+        text = _normalize_prompt(prompt)
+        key = None if kwargs else (text, pretty)
+        if key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+            if cached is not None:
+                self._schema, result = cached
+                self._schema_shared = True
+                return result
+        
         self._initialize_defaults()
         
         # Parse prompt for architectural requirements
-        self._parse_prompt(prompt, **kwargs)
+        self._parse_prompt(text, **kwargs)
         
-        # Generate structure
+        # Generate structure and furniture
         self._generate_structure()
         
-        # Add furniture based on room types
-        self._add_furniture()
-        
         # Apply materials
         self._apply_materials()
         
         # Validate and return JSON
-        scene_dict = self.schema.to_dict()
-        return json.dumps(scene_dict, indent=2, ensure_ascii=False)
+        result = self._serialize(pretty)
+        
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = (self._schema, result)
+                if len(self._cache) > _CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            self._schema_shared = True
+        return result
     
-    def _parse_prompt(self, prompt: str, **kwargs):
-        """Extract architectural requirements from prompt."""
-        prompt_lower = prompt.lower()
+    def _serialize(self, pretty: bool) -> str:
+        """Encode the current scene as compact or indented JSON."""
+        if orjson is not None:
+            # orjson walks the dataclasses itself, no intermediate dict tree
+            option = orjson.OPT_INDENT_2 if pretty else 0
+            return orjson.dumps(
+                self.schema, default=_orjson_default, option=option
+            ).decode()
+        if pretty:
+            return json.dumps(self.schema.to_dict(), indent=2, ensure_ascii=False)
+        return self.schema.to_json()
+    
+    def _parse_prompt(self, prompt_lower: str, **kwargs):
+        """Extract architectural requirements from a normalized (lowercase) prompt."""
+        # Room types and styles are whole words, found in a single scan
+        # (hyperscan when installed, otherwise one tokenizing regex pass)
+        keywords = _find_keywords(prompt_lower)
+        found = {_ROOM_KEYWORDS[k] for k in keywords if k in _ROOM_KEYWORDS}
+        themes = {_THEME_KEYWORDS[k] for k in keywords if k in _THEME_KEYWORDS}
+        
+        # Counts and area depend on neighbouring digits, keep a regex for those
+        counts = {}
+        area = None
+        for match in _COUNT_AREA_RE.finditer(prompt_lower):
+            kind = match.group("kind")
+            if kind is not None:
+                # First count per keyword, a digit count winning over a number
+                # word, as the original per-keyword search did
+                num = match.group("num")
+                if kind not in counts or (num.isdigit() and not counts[kind].isdigit()):
+                    counts[kind] = num
+            elif area is None:
+                area = min(float(match.group("area")), _MAX_AREA_M2)
         
         # Detect room types
         rooms_to_create = []
-        if "bedroom" in prompt_lower or "bed" in prompt_lower:
-            count = self._extract_number(prompt_lower, ["bedroom", "bed"])
-            for i in range(max(1, count)):
-                rooms_to_create.append(("bedroom", f"bedroom_{i+1}"))
-        
-        if "bathroom" in prompt_lower or "bath" in prompt_lower:
-            count = self._extract_number(prompt_lower, ["bathroom", "bath"])
-            for i in range(max(1, count)):
-                rooms_to_create.append(("bathroom", f"bathroom_{i+1}"))
-        
-        if "kitchen" in prompt_lower:
-            rooms_to_create.append(("kitchen", "kitchen_1"))
-        
-        if "living" in prompt_lower or "lounge" in prompt_lower:
-            rooms_to_create.append(("living", "living_room_1"))
+        for room_type in (RoomType.BEDROOM, RoomType.BATHROOM):
+            if room_type in found:
+                num = next((counts[kind] for kind in _COUNT_KINDS[room_type] if kind in counts), None)
+                if num is None:
+                    count = 1
+                elif num.isdigit():
+                    # Long digit runs are over the cap anyway, skip converting them
+                    count = int(num) if len(num) <= 4 else _MAX_ROOMS_PER_TYPE
+                else:
+                    count = _WORD_NUMS[num]
+                for i in range(min(max(1, count), _MAX_ROOMS_PER_TYPE)):
+                    rooms_to_create.append((room_type, f"{room_type.value}_{i+1}"))
+        
+        if RoomType.KITCHEN in found:
+            rooms_to_create.append((RoomType.KITCHEN, "kitchen_1"))
+        
+        if RoomType.LIVING in found:
+            rooms_to_create.append((RoomType.LIVING, "living_room_1"))
         
         # Always add at least a living room if nothing specified
         if not rooms_to_create:
-            rooms_to_create.append(("living", "living_room_1"))
+            rooms_to_create.append((RoomType.LIVING, "living_room_1"))
         
         # Detect style
-        if "scandinavian" in prompt_lower:
-            self.schema.styles.theme = "scandinavian"
-        elif "industrial" in prompt_lower:
-            self.schema.styles.theme = "industrial"
-        elif "minimalist" in prompt_lower:
-            self.schema.styles.theme = "minimalist"
-        elif "rustic" in prompt_lower:
-            self.schema.styles.theme = "rustic"
-        else:
-            self.schema.styles.theme = "modern"
+        self.schema.styles.theme = next(
+            (theme for theme in _THEMES if theme in themes), Theme.MODERN
+        )
         
         # Store rooms to create
         self._rooms_to_create = rooms_to_create
         
         # Detect size constraints
-        area_match = re.search(r'(\d+)\s*(?:sqm|m2|square\s*meters?)', prompt_lower)
-        if area_match:
-            self.schema.house.total_area_m2 = float(area_match.group(1))
-    
-    def _extract_number(self, text: str, keywords: List[str]) -> int:
-        """Extract number associated with keywords."""
-        # Word to number mapping
-        word_numbers = {
-            "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
-            "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
-        }
-        
-        for keyword in keywords:
-            # Try numeric patterns: "2 bedroom", "2-bedroom", "2bedroom"
-            pattern = rf'(\d+)[\s-]*{keyword}'
-            match = re.search(pattern, text)
-            if match:
-                return int(match.group(1))
-            
-            # Try word numbers: "two bedroom", "two-bedroom"
-            for word, num in word_numbers.items():
-                pattern = rf'{word}[\s-]*{keyword}'
-                if re.search(pattern, text):
-                    return num
-        
-        return 1
+        if area is not None:
+            self.schema.house.total_area_m2 = area
     
     def _generate_structure(self):
-        """Generate walls, rooms, and openings based on parsed requirements."""
+        """
+        Generate rooms, walls, openings, and furniture based on parsed requirements.
+        
+        Everything that belongs to a room is created in a single pass over
+        the rooms to create.
+        """
         rooms = self._rooms_to_create
+        n_rooms = len(rooms)
         
         # Calculate total area if not specified
         if self.schema.house.total_area_m2 == 0:
             # Estimate: ~15-20 m2 per room
-            self.schema.house.total_area_m2 = len(rooms) * 18
+            self.schema.house.total_area_m2 = n_rooms * 18
         
-        # Calculate footprint dimensions (assume rectangular)
+        # Calculate footprint and room dimensions (assume rectangular)
         area = self.schema.house.total_area_m2
-        aspect_ratio = 1.3  # Slightly longer than wide
-        self.schema.house.width_m = (area / aspect_ratio) ** 0.5
-        self.schema.house.depth_m = area / self.schema.house.width_m
+        width, depth, room_area, room_depth, xs = _layout(float(area), n_rooms, 1.3)
+        self.schema.house.width_m = width
+        self.schema.house.depth_m = depth
         self.schema.house.footprint_shape = "rectangle"
         
-        # Generate rooms with bounds
-        current_x = 0.0
-        wall_thickness = 0.2
+        # Generate exterior walls
+        self._generate_exterior_walls()
         
+        h = self.schema.house.ceiling_height_m
         for i, (room_type, room_id) in enumerate(rooms):
-            # Calculate room dimensions
-            room_area = area / len(rooms)
-            room_width = self.schema.house.width_m
-            room_depth = room_area / room_width
-            
             room = Room(
                 room_id=room_id,
-                name=room_type.capitalize().replace("_", " "),
+                name=room_type.value.capitalize().replace("_", " "),
                 level_id="ground_floor",
                 area_m2=room_area,
                 shape="rectangle",
                 bounds=RoomBounds(
-                    x=current_x,
+                    x=xs[i],
                     y=0.0,
-                    width=room_width,
+                    width=width,
                     depth=room_depth
                 ),
                 room_type=room_type,
@@ -178,32 +452,34 @@ class ModelerPro:
             # Set adjacent rooms
             if i > 0:
                 room.adjacent_rooms.append(rooms[i-1][1])
-            if i < len(rooms) - 1:
+            if i < n_rooms - 1:
                 room.adjacent_rooms.append(rooms[i+1][1])
+                
+                # Interior wall (thinner) at the boundary with the next room
+                x_pos = xs[i] + width
+                self.schema.walls.add(
+                    f"wall_int_{i+1}",
+                    (x_pos, 0.0),
+                    (x_pos, room_depth),
+                    h, 0.15, "ground_floor", False
+                )
             
             self.schema.rooms.append(room)
-            current_x += room_width
-        
-        # Generate exterior walls
-        self._generate_exterior_walls()
-        
-        # Generate interior walls between rooms
-        self._generate_interior_walls()
-        
-        # Generate openings (doors and windows)
-        self._generate_openings()
+            self._add_openings(room, i)
+            self._add_furniture(room)
         
         # Update confidence based on how well we matched the prompt
-        self.schema.meta.confidence = 0.8 if len(rooms) > 1 else 0.6
+        self.schema.meta.confidence = 0.8 if n_rooms > 1 else 0.6
     
-    def _get_privacy_level(self, room_type: str) -> str:
+    def _get_privacy_level(self, room_type: RoomType) -> PrivacyLevel:
         """Determine privacy level for room type."""
-        if room_type == "bathroom" or room_type == "bedroom":
-            return "private"
-        elif room_type == "kitchen":
-            return "semi-private"
-        else:
-            return "public"
+        match room_type:
+            case RoomType.BATHROOM | RoomType.BEDROOM:
+                return PrivacyLevel.PRIVATE
+            case RoomType.KITCHEN:
+                return PrivacyLevel.SEMI_PRIVATE
+            case _:
+                return PrivacyLevel.PUBLIC
     
     def _generate_exterior_walls(self):
         """Generate walls that enclose the building footprint."""
@@ -213,144 +489,74 @@ class ModelerPro:
         t = 0.2
         
         # Four exterior walls forming a rectangle
-        walls = [
-            Wall("wall_ext_1", [0, 0], [w, 0], h, t, "ground_floor", True),
-            Wall("wall_ext_2", [w, 0], [w, d], h, t, "ground_floor", True),
-            Wall("wall_ext_3", [w, d], [0, d], h, t, "ground_floor", True),
-            Wall("wall_ext_4", [0, d], [0, 0], h, t, "ground_floor", True),
-        ]
-        
-        self.schema.walls.extend(walls)
+        walls = self.schema.walls
+        walls.add("wall_ext_1", (0.0, 0.0), (w, 0.0), h, t, "ground_floor", True)
+        walls.add("wall_ext_2", (w, 0.0), (w, d), h, t, "ground_floor", True)
+        walls.add("wall_ext_3", (w, d), (0.0, d), h, t, "ground_floor", True)
+        walls.add("wall_ext_4", (0.0, d), (0.0, 0.0), h, t, "ground_floor", True)
     
-    def _generate_interior_walls(self):
-        """Generate walls separating rooms."""
-        if len(self.schema.rooms) < 2:
-            return
-        
-        h = self.schema.house.ceiling_height_m
-        t = 0.15  # Interior walls thinner
-        
-        for i in range(len(self.schema.rooms) - 1):
-            room1 = self.schema.rooms[i]
-            room2 = self.schema.rooms[i + 1]
-            
-            # Wall at the boundary between rooms
-            x_pos = room1.bounds.x + room1.bounds.width
-            wall = Wall(
-                f"wall_int_{i+1}",
-                [x_pos, 0],
-                [x_pos, room1.bounds.depth],
-                h, t, "ground_floor", False
-            )
-            self.schema.walls.append(wall)
-    
-    def _generate_openings(self):
-        """Generate doors and windows based on room requirements."""
-        wall_id_counter = 1
-        
-        for room in self.schema.rooms:
-            # Every room needs at least one door
-            # Find a wall adjacent to this room
-            wall_id = f"wall_int_{wall_id_counter}" if wall_id_counter <= len(self.schema.rooms) - 1 else "wall_ext_1"
-            
-            door = Opening(
-                opening_id=f"door_{room.room_id}",
-                type="door",
-                wall_id=wall_id,
+    def _add_openings(self, room: Room, index: int):
+        """Add the doors and windows a room requires."""
+        # Every room needs at least one door, on the interior wall it shares
+        # with the next room (the last room opens onto an exterior wall)
+        wall_id = f"wall_int_{index+1}" if index < len(self._rooms_to_create) - 1 else "wall_ext_1"
+        
+        door = Opening(
+            opening_id=f"door_{room.room_id}",
+            type="door",
+            wall_id=wall_id,
+            position_ratio=0.5,
+            width_m=0.9,
+            height_m=2.1,
+            swing="left",
+            transparent=False
+        )
+        self.schema.openings.append(door)
+        
+        # Bedrooms require windows
+        if room.room_type is RoomType.BEDROOM:
+            window = Opening(
+                opening_id=f"window_{room.room_id}",
+                type="window",
+                wall_id="wall_ext_2",
                 position_ratio=0.5,
-                width_m=0.9,
-                height_m=2.1,
-                swing="left",
-                transparent=False
+                width_m=1.2,
+                height_m=1.5,
+                swing="none",
+                transparent=True
             )
-            self.schema.openings.append(door)
-            
-            # Bedrooms require windows
-            if room.room_type == "bedroom":
-                window = Opening(
-                    opening_id=f"window_{room.room_id}",
-                    type="window",
-                    wall_id="wall_ext_2",
-                    position_ratio=0.5,
-                    width_m=1.2,
-                    height_m=1.5,
-                    swing="none",
-                    transparent=True
-                )
-                self.schema.openings.append(window)
-            
-            # Kitchens need ventilation (window)
-            if room.room_type == "kitchen":
-                window = Opening(
-                    opening_id=f"window_{room.room_id}",
-                    type="window",
-                    wall_id="wall_ext_2",
-                    position_ratio=0.3,
-                    width_m=0.8,
-                    height_m=1.2,
-                    swing="none",
-                    transparent=True
-                )
-                self.schema.openings.append(window)
-            
-            wall_id_counter += 1
+            self.schema.openings.append(window)
+        
+        # Kitchens need ventilation (window)
+        if room.room_type is RoomType.KITCHEN:
+            window = Opening(
+                opening_id=f"window_{room.room_id}",
+                type="window",
+                wall_id="wall_ext_2",
+                position_ratio=0.3,
+                width_m=0.8,
+                height_m=1.2,
+                swing="none",
+                transparent=True
+            )
+            self.schema.openings.append(window)
     
-    def _add_furniture(self):
-        """Add appropriate furniture to each room based on type."""
-        furniture_presets = {
-            "bedroom": [
-                ("bed", "modern_bed_01", [1.5, 2.0]),
-                ("wardrobe", "wardrobe_modern_01", [0.5, 1.0]),
-            ],
-            "kitchen": [
-                ("kitchen_cabinet", "kitchen_cabinet_modern_01", [2.0, 0.5]),
-                ("refrigerator", "fridge_standard_01", [0.5, 0.6]),
-            ],
-            "living": [
-                ("sofa", "modern_sofa_01", [2.0, 1.0]),
-                ("coffee_table", "coffee_table_modern_01", [1.5, 0.8]),
-            ],
-            "bathroom": [
-                ("toilet", "toilet_standard_01", [0.5, 0.4]),
-                ("sink", "sink_modern_01", [1.0, 0.5]),
-            ]
-        }
-        
-        for room in self.schema.rooms:
-            room_type = room.room_type
-            if room_type in furniture_presets:
-                for idx, (furn_type, preset, pos) in enumerate(furniture_presets[room_type]):
-                    furniture = Furniture(
-                        furniture_id=f"{furn_type}_{room.room_id}",
-                        type=furn_type,
-                        room_id=room.room_id,
-                        position=[
-                            pos[0],  # Store relative to room origin, not absolute
-                            pos[1]   # Store relative to room origin, not absolute
-                        ],
-                        rotation_deg=0.0,
-                        scale=1.0,
-                        preset=preset
-                    )
-                    self.schema.furniture.append(furniture)
+    def _add_furniture(self, room: Room):
+        """Add appropriate furniture to a room based on its type."""
+        for furn_type, preset, pos in _FURNITURE_PRESETS.get(room.room_type, ()):
+            furniture = Furniture(
+                furniture_id=f"{furn_type}_{room.room_id}",
+                type=furn_type,
+                room_id=room.room_id,
+                position=list(pos),  # Store relative to room origin, not absolute
+                rotation_deg=0.0,
+                scale=1.0,
+                preset=preset
+            )
+            self.schema.furniture.append(furniture)
     
     def _apply_materials(self):
         """Apply default materials based on room types and style."""
-        self.schema.materials = {
-            "walls": "paint_white_matte",
-            "floor_living": "wood_oak_light",
-            "floor_bedroom": "wood_oak_light",
-            "floor_kitchen": "tile_ceramic_gray",
-            "floor_bathroom": "tile_ceramic_gray"
-        }
-        
-        # Adjust based on style theme
-        if self.schema.styles.theme == "scandinavian":
-            self.schema.materials["walls"] = "paint_white_matte"
-            self.schema.materials["floor_living"] = "wood_oak_light"
-        elif self.schema.styles.theme == "industrial":
-            self.schema.materials["walls"] = "concrete_exposed"
-            self.schema.materials["floor_living"] = "concrete_polished"
-        elif self.schema.styles.theme == "rustic":
-            self.schema.materials["walls"] = "wood_panel_natural"
-            self.schema.materials["floor_living"] = "wood_dark_oak"
+        self.schema.materials = _MATERIALS_BY_THEME.get(
+            self.schema.styles.theme, _MATERIALS_BY_THEME[Theme.MODERN]
+        )
@@ -3,12 +3,23 @@ JSON Schema definitions for 3D Modeler Pro output structure.
 Ensures all generated JSON follows the required format.
 """
 
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from array import array
+from json.encoder import encode_basestring as _js
+from typing import Dict, Iterable, Iterator, List, Any, Mapping, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
 from enum import Enum
 
 
-class RoomType(Enum):
+# Shared, immutable defaults so new scenes don't re-allocate constant lists
+DEFAULT_COLOR_PALETTE = ("#ffffff", "#cfcfcf", "#8a8a8a")
+DEFAULT_MATERIAL_BIAS = (("wood", 0.5), ("metal", 0.3), ("concrete", 0.2))
+DEFAULT_EXPORT_FORMATS = ("glb", "fbx", "obj", "usd", "blend")
+
+
+# Enums mix in str so members can be stored on the schema and serialized as
+# their plain values by json and orjson alike
+
+class RoomType(str, Enum):
     KITCHEN = "kitchen"
     BEDROOM = "bedroom"
     BATHROOM = "bathroom"
@@ -17,18 +28,18 @@ class RoomType(Enum):
     STORAGE = "storage"
 
 
-class PrivacyLevel(Enum):
+class PrivacyLevel(str, Enum):
     PUBLIC = "public"
     SEMI_PRIVATE = "semi-private"
     PRIVATE = "private"
 
 
-class OpeningType(Enum):
+class OpeningType(str, Enum):
     DOOR = "door"
     WINDOW = "window"
 
 
-class Theme(Enum):
+class Theme(str, Enum):
     SCANDINAVIAN = "scandinavian"
     INDUSTRIAL = "industrial"
     MINIMALIST = "minimalist"
@@ -36,16 +47,25 @@ class Theme(Enum):
     RUSTIC = "rustic"
 
 
-@dataclass
+@dataclass(slots=True)
 class Meta:
     version: str = "1.0"
     unit_system: str = "metric"
     scale: float = 1.0
     generated_by: str = "3D Modeler Pro"
     confidence: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "unit_system": self.unit_system,
+            "scale": self.scale,
+            "generated_by": self.generated_by,
+            "confidence": self.confidence
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class House:
     type: str = "residential"
     footprint_shape: str = "rectangle"
@@ -54,24 +74,50 @@ class House:
     depth_m: float = 0.0
     ceiling_height_m: float = 2.7
     floors: int = 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "footprint_shape": self.footprint_shape,
+            "total_area_m2": self.total_area_m2,
+            "width_m": self.width_m,
+            "depth_m": self.depth_m,
+            "ceiling_height_m": self.ceiling_height_m,
+            "floors": self.floors
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Level:
     level_id: str = "ground_floor"
     elevation_m: float = 0.0
     height_m: float = 2.7
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "level_id": self.level_id,
+            "elevation_m": self.elevation_m,
+            "height_m": self.height_m
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class RoomBounds:
     x: float = 0.0
     y: float = 0.0
     width: float = 0.0
     depth: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "depth": self.depth
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     room_id: str = ""
     name: str = ""
@@ -80,17 +126,30 @@ class Room:
     shape: str = "rectangle"
     bounds: RoomBounds = None
     adjacent_rooms: List[str] = None
-    room_type: str = ""
-    privacy_level: str = "public"
+    room_type: RoomType = RoomType.LIVING
+    privacy_level: PrivacyLevel = PrivacyLevel.PUBLIC
     
     def __post_init__(self):
         if self.bounds is None:
             self.bounds = RoomBounds()
         if self.adjacent_rooms is None:
             self.adjacent_rooms = []
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "room_id": self.room_id,
+            "name": self.name,
+            "level_id": self.level_id,
+            "area_m2": self.area_m2,
+            "shape": self.shape,
+            "bounds": self.bounds.to_dict(),
+            "adjacent_rooms": self.adjacent_rooms,
+            "room_type": self.room_type,
+            "privacy_level": self.privacy_level
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Wall:
     wall_id: str = ""
     start: List[float] = None
@@ -105,9 +164,108 @@ class Wall:
             self.start = [0.0, 0.0]
         if self.end is None:
             self.end = [0.0, 0.0]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_id": self.wall_id,
+            "start": self.start,
+            "end": self.end,
+            "height_m": self.height_m,
+            "thickness_m": self.thickness_m,
+            "level_id": self.level_id,
+            "load_bearing": self.load_bearing
+        }
 
 
-@dataclass
+class WallTable:
+    """
+    Scene walls stored column-wise (structure of arrays).
+    
+    Coordinates live in one contiguous float64 array as x0, y0, x1, y1 per
+    wall, with parallel columns for the remaining fields, instead of a Wall
+    object and two float lists per wall. Indexing and iterating yield Wall
+    objects built on the fly.
+    """
+    __slots__ = ("wall_ids", "coords", "heights", "thicknesses", "level_ids", "load_bearing")
+    
+    def __init__(self):
+        self.wall_ids: List[str] = []
+        self.coords = array("d")
+        self.heights = array("d")
+        self.thicknesses = array("d")
+        self.level_ids: List[str] = []
+        self.load_bearing: List[bool] = []
+    
+    def add(self, wall_id: str, start: Sequence[float], end: Sequence[float],
+            height_m: float = 2.7, thickness_m: float = 0.2,
+            level_id: str = "ground_floor", load_bearing: bool = True):
+        """Append a wall from its field values."""
+        self.wall_ids.append(wall_id)
+        self.coords.extend((start[0], start[1], end[0], end[1]))
+        self.heights.append(height_m)
+        self.thicknesses.append(thickness_m)
+        self.level_ids.append(level_id)
+        self.load_bearing.append(load_bearing)
+    
+    def append(self, wall: Wall):
+        self.add(wall.wall_id, wall.start, wall.end, wall.height_m,
+                 wall.thickness_m, wall.level_id, wall.load_bearing)
+    
+    def extend(self, walls: Iterable[Wall]):
+        for wall in walls:
+            self.append(wall)
+    
+    def __len__(self) -> int:
+        return len(self.wall_ids)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Wall, List[Wall]]:
+        """
+        Return the wall (or list of walls, for a slice) at index.
+        
+        Walls are built from the columns on each access, so changing a returned
+        Wall does not change the table; assign it back with table[i] = wall.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self.wall_ids))[index]]
+        index = range(len(self.wall_ids))[index]
+        x0, y0, x1, y1 = self.coords[4 * index:4 * index + 4]
+        return Wall(self.wall_ids[index], [x0, y0], [x1, y1], self.heights[index],
+                    self.thicknesses[index], self.level_ids[index], self.load_bearing[index])
+    
+    def __setitem__(self, index: int, wall: Wall):
+        index = range(len(self.wall_ids))[index]
+        self.wall_ids[index] = wall.wall_id
+        self.coords[4 * index:4 * index + 4] = array("d", (*wall.start[:2], *wall.end[:2]))
+        self.heights[index] = wall.height_m
+        self.thicknesses[index] = wall.thickness_m
+        self.level_ids[index] = wall.level_id
+        self.load_bearing[index] = wall.load_bearing
+    
+    def __iter__(self) -> Iterator[Wall]:
+        for index in range(len(self.wall_ids)):
+            yield self[index]
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Convert to a list of wall dicts for JSON serialization."""
+        coords = self.coords.tolist()
+        return [
+            {
+                "wall_id": wall_id,
+                "start": coords[4 * i:4 * i + 2],
+                "end": coords[4 * i + 2:4 * i + 4],
+                "height_m": height_m,
+                "thickness_m": thickness_m,
+                "level_id": level_id,
+                "load_bearing": load_bearing
+            }
+            for i, (wall_id, height_m, thickness_m, level_id, load_bearing) in enumerate(zip(
+                self.wall_ids, self.heights.tolist(), self.thicknesses.tolist(),
+                self.level_ids, self.load_bearing
+            ))
+        ]
+
+
+@dataclass(slots=True)
 class Opening:
     opening_id: str = ""
     type: str = "door"
@@ -117,9 +275,21 @@ class Opening:
     height_m: float = 2.1
     swing: str = "none"
     transparent: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "opening_id": self.opening_id,
+            "type": self.type,
+            "wall_id": self.wall_id,
+            "position_ratio": self.position_ratio,
+            "width_m": self.width_m,
+            "height_m": self.height_m,
+            "swing": self.swing,
+            "transparent": self.transparent
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Furniture:
     furniture_id: str = ""
     type: str = ""
@@ -132,15 +302,32 @@ class Furniture:
     def __post_init__(self):
         if self.position is None:
             self.position = [0.0, 0.0]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "furniture_id": self.furniture_id,
+            "type": self.type,
+            "room_id": self.room_id,
+            "position": self.position,
+            "rotation_deg": self.rotation_deg,
+            "scale": self.scale,
+            "preset": self.preset
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Accessibility:
     wheelchair: bool = False
     door_min_width_m: float = 0.9
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wheelchair": self.wheelchair,
+            "door_min_width_m": self.door_min_width_m
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Constraints:
     budget_level: str = "medium"
     accessibility: Accessibility = None
@@ -149,45 +336,131 @@ class Constraints:
     def __post_init__(self):
         if self.accessibility is None:
             self.accessibility = Accessibility()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "budget_level": self.budget_level,
+            "accessibility": self.accessibility.to_dict(),
+            "region_code": self.region_code
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Styles:
-    theme: str = "modern"
-    color_palette: List[str] = None
+    theme: Theme = Theme.MODERN
+    color_palette: Tuple[str, ...] = DEFAULT_COLOR_PALETTE
     material_bias: Dict[str, float] = None
     
     def __post_init__(self):
-        if self.color_palette is None:
-            self.color_palette = ["#ffffff", "#cfcfcf", "#8a8a8a"]
         if self.material_bias is None:
-            self.material_bias = {"wood": 0.5, "metal": 0.3, "concrete": 0.2}
+            self.material_bias = dict(DEFAULT_MATERIAL_BIAS)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "theme": self.theme,
+            "color_palette": self.color_palette,
+            "material_bias": self.material_bias
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class Exports:
-    formats: List[str] = None
+    formats: Tuple[str, ...] = DEFAULT_EXPORT_FORMATS
     include_textures: bool = True
     include_furniture: bool = True
     optimize_mesh: bool = True
     
-    def __post_init__(self):
-        if self.formats is None:
-            self.formats = ["glb", "fbx", "obj", "usd", "blend"]
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "formats": self.formats,
+            "include_textures": self.include_textures,
+            "include_furniture": self.include_furniture,
+            "optimize_mesh": self.optimize_mesh
+        }
 
 
+# Compact JSON templates for SceneSchema.to_json(). Strings are filled in
+# already encoded (_js), numbers via repr() exactly as json.dumps writes them.
+_META_JSON = (
+    '{{"version":{},"unit_system":{},"scale":{!r},"generated_by":{},"confidence":{!r}}}'
+)
+_HOUSE_JSON = (
+    '{{"type":{},"footprint_shape":{},"total_area_m2":{!r},"width_m":{!r},'
+    '"depth_m":{!r},"ceiling_height_m":{!r},"floors":{!r}}}'
+)
+_LEVEL_JSON = '{{"level_id":{},"elevation_m":{!r},"height_m":{!r}}}'
+_ROOM_JSON = (
+    '{{"room_id":{},"name":{},"level_id":{},"area_m2":{!r},"shape":{},'
+    '"bounds":{{"x":{!r},"y":{!r},"width":{!r},"depth":{!r}}},'
+    '"adjacent_rooms":{},"room_type":{},"privacy_level":{}}}'
+)
+_WALL_JSON = (
+    '{{"wall_id":{},"start":[{!r},{!r}],"end":[{!r},{!r}],"height_m":{!r},'
+    '"thickness_m":{!r},"level_id":{},"load_bearing":{}}}'
+)
+_OPENING_JSON = (
+    '{{"opening_id":{},"type":{},"wall_id":{},"position_ratio":{!r},"width_m":{!r},'
+    '"height_m":{!r},"swing":{},"transparent":{}}}'
+)
+_FURNITURE_JSON = (
+    '{{"furniture_id":{},"type":{},"room_id":{},"position":{},"rotation_deg":{!r},'
+    '"scale":{!r},"preset":{}}}'
+)
+_STYLES_JSON = '{{"theme":{},"color_palette":{},"material_bias":{}}}'
+_CONSTRAINTS_JSON = (
+    '{{"budget_level":{},"accessibility":{{"wheelchair":{},"door_min_width_m":{!r}}},'
+    '"region_code":{}}}'
+)
+_EXPORTS_JSON = (
+    '{{"formats":{},"include_textures":{},"include_furniture":{},"optimize_mesh":{}}}'
+)
+
+
+def _json_bool(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def _json_strings(values: Iterable[str]) -> str:
+    return "[" + ",".join(map(_js, values)) + "]"
+
+
+def _json_numbers(values: Iterable[float]) -> str:
+    return "[" + ",".join(map(repr, values)) + "]"
+
+
+def _json_object(mapping: Mapping[str, Any], encode) -> str:
+    return "{" + ",".join(_js(k) + ":" + encode(v) for k, v in mapping.items()) + "}"
+
+
+@dataclass(slots=True, init=False)
 class SceneSchema:
-    """Main scene structure following the required JSON format."""
+    """
+    Main scene structure following the required JSON format.
+    
+    Declared as a dataclass so encoders that understand dataclasses (orjson)
+    can serialize the scene tree directly instead of going through to_dict().
+    """
+    meta: Meta
+    house: House
+    levels: List[Level]
+    rooms: List[Room]
+    walls: WallTable
+    openings: List[Opening]
+    furniture: List[Furniture]
+    materials: Mapping[str, str]
+    styles: Styles
+    constraints: Constraints
+    exports: Exports
     
     def __init__(self):
         self.meta = Meta()
         self.house = House()
-        self.levels: List[Level] = []
-        self.rooms: List[Room] = []
-        self.walls: List[Wall] = []
-        self.openings: List[Opening] = []
-        self.furniture: List[Furniture] = []
-        self.materials: Dict[str, str] = {}
+        self.levels = []
+        self.rooms = []
+        self.walls = WallTable()
+        self.openings = []
+        self.furniture = []
+        self.materials = {}
         self.styles = Styles()
         self.constraints = Constraints()
         self.exports = Exports()
@@ -195,37 +468,132 @@ class SceneSchema:
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
-            "meta": asdict(self.meta),
-            "house": asdict(self.house),
-            "levels": [asdict(level) for level in self.levels],
-            "rooms": [self._room_to_dict(room) for room in self.rooms],
-            "walls": [asdict(wall) for wall in self.walls],
-            "openings": [asdict(opening) for opening in self.openings],
-            "furniture": [asdict(furn) for furn in self.furniture],
-            "materials": self.materials,
-            "styles": asdict(self.styles),
-            "constraints": self._constraints_to_dict(),
-            "exports": asdict(self.exports)
+            "meta": self.meta.to_dict(),
+            "house": self.house.to_dict(),
+            "levels": [level.to_dict() for level in self.levels],
+            "rooms": [room.to_dict() for room in self.rooms],
+            "walls": self.walls.to_list(),
+            "openings": [opening.to_dict() for opening in self.openings],
+            "furniture": [furn.to_dict() for furn in self.furniture],
+            "materials": dict(self.materials),
+            "styles": self.styles.to_dict(),
+            "constraints": self.constraints.to_dict(),
+            "exports": self.exports.to_dict()
         }
     
-    def _room_to_dict(self, room: Room) -> Dict[str, Any]:
-        """Convert room with nested bounds to dict."""
-        return {
-            "room_id": room.room_id,
-            "name": room.name,
-            "level_id": room.level_id,
-            "area_m2": room.area_m2,
-            "shape": room.shape,
-            "bounds": asdict(room.bounds),
-            "adjacent_rooms": room.adjacent_rooms,
-            "room_type": room.room_type,
-            "privacy_level": room.privacy_level
-        }
+    def to_json(self) -> str:
+        """
+        Serialize to compact JSON without building the to_dict() tree.
+        
+        Produces the same text as json.dumps(self.to_dict(), separators=(',', ':'),
+        ensure_ascii=False) by filling per-object templates. Numbers must be
+        finite: repr() writes inf/nan, which is not JSON.
+        """
+        meta, house, styles = self.meta, self.house, self.styles
+        accessibility = self.constraints.accessibility
+        exports = self.exports
+        walls = self.walls
+        coords = walls.coords.tolist()
+        
+        parts = [
+            '{"meta":',
+            _META_JSON.format(
+                _js(meta.version), _js(meta.unit_system), meta.scale,
+                _js(meta.generated_by), meta.confidence
+            ),
+            ',"house":',
+            _HOUSE_JSON.format(
+                _js(house.type), _js(house.footprint_shape), house.total_area_m2,
+                house.width_m, house.depth_m, house.ceiling_height_m, house.floors
+            ),
+            ',"levels":[',
+            ",".join(
+                _LEVEL_JSON.format(_js(level.level_id), level.elevation_m, level.height_m)
+                for level in self.levels
+            ),
+            '],"rooms":[',
+            ",".join(
+                _ROOM_JSON.format(
+                    _js(room.room_id), _js(room.name), _js(room.level_id), room.area_m2,
+                    _js(room.shape), room.bounds.x, room.bounds.y, room.bounds.width,
+                    room.bounds.depth, _json_strings(room.adjacent_rooms),
+                    _js(room.room_type), _js(room.privacy_level)
+                )
+                for room in self.rooms
+            ),
+            '],"walls":[',
+            ",".join(
+                _WALL_JSON.format(
+                    _js(wall_id), *coords[4 * i:4 * i + 4], height_m, thickness_m,
+                    _js(level_id), _json_bool(load_bearing)
+                )
+                for i, (wall_id, height_m, thickness_m, level_id, load_bearing) in enumerate(zip(
+                    walls.wall_ids, walls.heights.tolist(), walls.thicknesses.tolist(),
+                    walls.level_ids, walls.load_bearing
+                ))
+            ),
+            '],"openings":[',
+            ",".join(
+                _OPENING_JSON.format(
+                    _js(opening.opening_id), _js(opening.type), _js(opening.wall_id),
+                    opening.position_ratio, opening.width_m, opening.height_m,
+                    _js(opening.swing), _json_bool(opening.transparent)
+                )
+                for opening in self.openings
+            ),
+            '],"furniture":[',
+            ",".join(
+                _FURNITURE_JSON.format(
+                    _js(furn.furniture_id), _js(furn.type), _js(furn.room_id),
+                    _json_numbers(furn.position), furn.rotation_deg, furn.scale,
+                    _js(furn.preset)
+                )
+                for furn in self.furniture
+            ),
+            '],"materials":',
+            _json_object(self.materials, _js),
+            ',"styles":',
+            _STYLES_JSON.format(
+                _js(styles.theme), _json_strings(styles.color_palette),
+                _json_object(styles.material_bias, repr)
+            ),
+            ',"constraints":',
+            _CONSTRAINTS_JSON.format(
+                _js(self.constraints.budget_level), _json_bool(accessibility.wheelchair),
+                accessibility.door_min_width_m, _js(self.constraints.region_code)
+            ),
+            ',"exports":',
+            _EXPORTS_JSON.format(
+                _json_strings(exports.formats), _json_bool(exports.include_textures),
+                _json_bool(exports.include_furniture), _json_bool(exports.optimize_mesh)
+            ),
+            '}',
+        ]
+        return "".join(parts)
+
+
+def validate_json_structure(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """Validate that a scene dict (to_dict() or parsed JSON) follows the required schema."""
+    errors = []
+    required_keys = [
+        "meta", "house", "levels", "rooms", "walls", "openings",
+        "furniture", "materials", "styles", "constraints", "exports"
+    ]
     
-    def _constraints_to_dict(self) -> Dict[str, Any]:
-        """Convert constraints with nested accessibility to dict."""
-        return {
-            "budget_level": self.constraints.budget_level,
-            "accessibility": asdict(self.constraints.accessibility),
-            "region_code": self.constraints.region_code
-        }
+    for key in required_keys:
+        if key not in data:
+            errors.append(f"Missing required key: {key}")
+    
+    # Validate meta
+    if "meta" in data:
+        meta = data["meta"]
+        if "version" not in meta or "confidence" not in meta:
+            errors.append("Meta missing required fields")
+    
+    # Validate house
+    if "house" in data:
+        house = data["house"]
+        if "total_area_m2" not in house or "width_m" not in house:
+            errors.append("House missing required fields")
+    
+    return len(errors) == 0, errors
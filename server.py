@@ -3,17 +3,174 @@
 Simple HTTP server to serve the 3D viewer
 Run: python3 server.py
 Then open http://localhost:8000/viewer.html
+
+Scenes can also be generated over HTTP:
+POST /generate with a JSON body {"prompt": "...", "pretty": false}
 """
 
+import datetime
+import email.utils
+import functools
+import gzip
 import http.server
-import socketserver
+import io
+import json
 import os
+import queue
 import webbrowser
 from pathlib import Path
 
+from modeler import ModelerPro
+
 PORT = 8000
 
+# Largest request body accepted by POST /generate
+MAX_BODY_BYTES = 64 * 1024
+
+# Content types worth compressing (scenes, pages, scripts)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript")
+
+
+# Idle generators reused across requests instead of building one per request;
+# LIFO hands out the most recently used instance first
+_MODELER_POOL = queue.LifoQueue()
+
+
+def generate_scene(prompt, pretty=False):
+    """Generate scene JSON with a pooled ModelerPro instance."""
+    try:
+        modeler = _MODELER_POOL.get_nowait()
+    except queue.Empty:
+        modeler = ModelerPro()
+    try:
+        return modeler.generate(prompt, pretty=pretty)
+    finally:
+        _MODELER_POOL.put(modeler)
+
+
+def _accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header value allows gzip (q-value above 0)."""
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, *params = coding.split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[name.strip().lower()] = q
+    # An explicit gzip entry overrides the "*" wildcard
+    q = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return q > 0
+
+
+@functools.lru_cache(maxsize=64)
+def _gzip_file(path, mtime_ns):
+    """Compressed file contents, cached until the file changes."""
+    with open(path, 'rb') as f:
+        return gzip.compress(f.read())
+
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep connections open so the viewer's follow-up requests reuse them
+    protocol_version = "HTTP/1.1"
+    
+    def send_head(self):
+        """Serve compressible files gzip-encoded when the client accepts it."""
+        if not _accepts_gzip(self.headers.get("Accept-Encoding", "")):
+            return super().send_head()
+        
+        path = self.translate_path(self.path)
+        ctype = self.guess_type(path)
+        if os.path.isdir(path) or not ctype.startswith(COMPRESSIBLE_TYPES):
+            return super().send_head()
+        
+        try:
+            st = os.stat(path)
+        except OSError:
+            return super().send_head()
+        
+        # Answer conditional requests like SimpleHTTPRequestHandler does
+        if "If-Modified-Since" in self.headers and "If-None-Match" not in self.headers:
+            try:
+                ims = email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"])
+            except (TypeError, IndexError, OverflowError, ValueError):
+                pass
+            else:
+                if ims.tzinfo is None:
+                    ims = ims.replace(tzinfo=datetime.timezone.utc)
+                if ims.tzinfo is datetime.timezone.utc:
+                    last_modif = datetime.datetime.fromtimestamp(
+                        st.st_mtime, datetime.timezone.utc).replace(microsecond=0)
+                    if last_modif <= ims:
+                        self.send_response(304)
+                        self.send_header("Vary", "Accept-Encoding")
+                        self.end_headers()
+                        return None
+        
+        try:
+            data = _gzip_file(path, st.st_mtime_ns)
+        except OSError:
+            return super().send_head()
+        
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return io.BytesIO(data)
+    
+    def do_POST(self):
+        """Generate a scene from a prompt: POST /generate."""
+        if self.path.split("?", 1)[0] != "/generate":
+            self.send_error(404, "File not found")
+            return
+        
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_error(400, "Invalid Content-Length")
+            return
+        if length > MAX_BODY_BYTES:
+            self.send_error(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+            return
+        
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            prompt = request["prompt"]
+            if not isinstance(prompt, str):
+                raise TypeError(prompt)
+        except (ValueError, KeyError, TypeError):
+            self.send_error(400, 'Expected a JSON body with a "prompt" string')
+            return
+        
+        body = generate_scene(prompt, pretty=bool(request.get("pretty", False))).encode("utf-8")
+        compress = _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        if compress:
+            body = gzip.compress(body)
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_OPTIONS(self):
+        """Answer CORS preflight requests for POST /generate."""
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
     def end_headers(self):
         # Add CORS headers for local development
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -21,10 +178,16 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
 
+class ModelerHTTPServer(http.server.ThreadingHTTPServer):
+    # Handle each request in its own thread so parallel viewer fetches
+    # and kept-alive connections don't block one another
+    daemon_threads = True  # Don't let open connections keep Ctrl+C from exiting
+    allow_reuse_address = True  # Restart without waiting out TIME_WAIT
+
 def main():
     os.chdir(Path(__file__).parent)
     
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
+    with ModelerHTTPServer(("", PORT), MyHTTPRequestHandler) as httpd:
         url = f"http://localhost:{PORT}/editor.html"
         print("=" * 60)
         print("🚀 3D Modeler Pro - Interactive Editor")
@@ -36,6 +199,7 @@ def main():
         print("   - Load existing JSON scenes")
         print("   - Save and export your designs")
         print("   - Use mouse to rotate, zoom, and pan")
+        print(f"   - POST a prompt to http://localhost:{PORT}/generate for scene JSON")
         print("\n🛑 Press Ctrl+C to stop the server")
         print("=" * 60)
         
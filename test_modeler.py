@@ -3,35 +3,15 @@ Test suite for 3D Modeler Pro
 Validates JSON output structure and architectural logic.
 """
 
+import functools
+import gzip
+import http.client
 import json
+import os
+import threading
+import modeler as modeler_module
 from modeler import ModelerPro
-
-
-def validate_json_structure(data: dict) -> tuple[bool, list[str]]:
-    """Validate that JSON follows required schema."""
-    errors = []
-    required_keys = [
-        "meta", "house", "levels", "rooms", "walls", "openings",
-        "furniture", "materials", "styles", "constraints", "exports"
-    ]
-    
-    for key in required_keys:
-        if key not in data:
-            errors.append(f"Missing required key: {key}")
-    
-    # Validate meta
-    if "meta" in data:
-        meta = data["meta"]
-        if "version" not in meta or "confidence" not in meta:
-            errors.append("Meta missing required fields")
-    
-    # Validate house
-    if "house" in data:
-        house = data["house"]
-        if "total_area_m2" not in house or "width_m" not in house:
-            errors.append("House missing required fields")
-    
-    return len(errors) == 0, errors
+from schema import Wall, WallTable, validate_json_structure
 
 
 def test_basic_generation():
@@ -148,6 +128,302 @@ def test_architectural_rules():
         return False
 
 
+def test_output_format():
+    """Test compact default output and the pretty option."""
+    modeler = ModelerPro()
+    compact = modeler.generate("A 2-bedroom apartment with kitchen")
+    pretty = modeler.generate("A 2-bedroom apartment with kitchen", pretty=True)
+    
+    try:
+        if "\n" not in compact and "\n" in pretty and json.loads(compact) == json.loads(pretty):
+            print("✓ Output format: PASSED")
+            print(f"  - Compact: {len(compact)} bytes, pretty: {len(pretty)} bytes")
+            return True
+        else:
+            print("✗ Output format: FAILED - compact and pretty output differ")
+            return False
+    except json.JSONDecodeError as e:
+        print(f"✗ Output format: FAILED - Invalid JSON: {e}")
+        return False
+
+
+def test_keyword_boundaries():
+    """Test whole-word room keywords and counts (plurals allowed) and count precedence."""
+    cases = {
+        "An embedded wardrobe": {},
+        "2 bedside tables and a bedroom": {"bedroom": 1},
+        "3 bedrooms and 2 baths": {"bedroom": 3, "bathroom": 2},
+        "Three beds, a kitchenette and a bathtub": {"bedroom": 3},
+        "A twobedroom flat": {},
+        # Counts on "bedroom"/"bathroom" take precedence over "bed"/"bath"
+        "2 bed 3 bedrooms": {"bedroom": 3},
+        "2 baths and 1 bathroom": {"bathroom": 1},
+    }
+    
+    failures = []
+    for prompt, expected in cases.items():
+        data = json.loads(ModelerPro().generate(prompt))
+        counts = {}
+        for room in data["rooms"]:
+            if room["room_type"] != "living":
+                counts[room["room_type"]] = counts.get(room["room_type"], 0) + 1
+        if counts != expected:
+            failures.append(f"{prompt!r}: {counts}")
+    
+    if not failures:
+        print("✓ Keyword boundaries: PASSED")
+        return True
+    else:
+        print(f"✗ Keyword boundaries: FAILED - {'; '.join(failures)}")
+        return False
+
+
+def test_wall_table():
+    """Test WallTable add, iteration, indexing, slicing and to_list."""
+    table = WallTable()
+    table.add("wall_1", [0.0, 0.0], [5.0, 0.0])
+    table.add("wall_2", [5.0, 0.0], [5.0, 4.0], thickness_m=0.15, load_bearing=False)
+    table.append(Wall("wall_3", [5.0, 4.0], [0.0, 4.0]))
+    
+    walls = list(table)
+    table[1] = Wall("wall_2", [5.0, 0.0], [5.0, 6.0], thickness_m=0.15, load_bearing=False)
+    as_dicts = table.to_list()
+    
+    checks = [
+        len(table) == 3 and [w.wall_id for w in walls] == ["wall_1", "wall_2", "wall_3"],
+        table[-1].start == [5.0, 4.0] and table[0].end == [5.0, 0.0],
+        [w.wall_id for w in table[1:]] == ["wall_2", "wall_3"],
+        table[1].end == [5.0, 6.0] and walls[1].end == [5.0, 4.0],
+        as_dicts[1] == {"wall_id": "wall_2", "start": [5.0, 0.0], "end": [5.0, 6.0],
+                        "height_m": 2.7, "thickness_m": 0.15,
+                        "level_id": "ground_floor", "load_bearing": False},
+    ]
+    
+    if all(checks):
+        print("✓ Wall table: PASSED")
+        return True
+    else:
+        print(f"✗ Wall table: FAILED - checks {checks}")
+        return False
+
+
+def test_find_keywords():
+    """Test the keyword scan, including the fallback used without hyperscan."""
+    text = "2 bedrooms, an embedded bathtub and a scandinavian kitchen"
+    expected = {"bedrooms", "scandinavian", "kitchen"}
+    
+    saved = modeler_module._keyword_db
+    modeler_module._keyword_db = False  # Force the tokenizing fallback
+    try:
+        fallback = modeler_module._find_keywords(text)
+    finally:
+        modeler_module._keyword_db = saved
+    default = modeler_module._find_keywords(text)
+    
+    if fallback == default == expected:
+        print("✓ Keyword scan: PASSED")
+        return True
+    else:
+        print(f"✗ Keyword scan: FAILED - fallback={fallback}, default={default}")
+        return False
+
+
+def _reject_constant(name):
+    raise ValueError(f"Non-standard JSON constant: {name}")
+
+
+def test_json_writer():
+    """Test that the template JSON writer matches json.dumps."""
+    modeler = ModelerPro()
+    matches = []
+    # A 400-digit area would overflow to inf; it is clamped so the output stays
+    # strict JSON (no Infinity/NaN) with either encoder
+    for prompt in ("Two bedroom rustic cottage with a bath and kitchen, 90 sqm",
+                   "A bedroom flat, " + "9" * 400 + " sqm"):
+        modeler.generate(prompt)
+        scene = modeler.schema
+        expected = json.dumps(scene.to_dict(), separators=(',', ':'), ensure_ascii=False)
+        text = scene.to_json()
+        strict = True
+        for output in (text, modeler.generate(prompt)):
+            try:
+                json.loads(output, parse_constant=_reject_constant)
+            except ValueError:
+                strict = False
+        matches.append(text == expected and strict)
+    
+    if all(matches):
+        print("✓ JSON writer: PASSED")
+        return True
+    else:
+        print("✗ JSON writer: FAILED - to_json() differs from json.dumps")
+        return False
+
+
+def test_prompt_cache():
+    """Test that repeated prompts are served from the cache."""
+    ModelerPro.clear_cache()
+    first = ModelerPro()
+    result1 = first.generate("A 2-bedroom apartment with kitchen")
+    schema1 = first.schema
+    
+    # Case and whitespace differences hit the same cache entry
+    second = ModelerPro()
+    result2 = second.generate("  a 2-Bedroom   apartment with KITCHEN ")
+    
+    # Generating a different scene must not disturb the cached one
+    first.generate("A scandinavian bathroom")
+    result3 = second.generate("A 2-bedroom apartment with kitchen")
+    
+    # Editing a returned scene must not leak into the cached one
+    schema1.rooms.clear()
+    third = ModelerPro()
+    result4 = third.generate("A 2-bedroom apartment with kitchen")
+    
+    if (result1 == result2 == result3 == result4 and len(ModelerPro._cache) == 2
+            and json.loads(json.dumps(third.schema.to_dict())) == json.loads(result4)
+            and third.schema is not second.schema):
+        print("✓ Prompt cache: PASSED")
+        return True
+    else:
+        print("✗ Prompt cache: FAILED - cached result differs")
+        return False
+
+
+def test_layout_kernel():
+    """Test that the plain and numba layout paths agree."""
+    expected = modeler_module._layout_kernel(60.0, 3, 1.3)
+    paths = [modeler_module._resolve_layout(False)]
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        print("  - numba not installed: compiled path SKIPPED")
+    else:
+        compiled = modeler_module._resolve_layout(True)
+        if compiled is modeler_module._layout_kernel:
+            print("✗ Layout kernel: FAILED - numba installed but kernel not compiled")
+            return False
+        paths.append(compiled)
+    results = [layout(60.0, 3, 1.3) for layout in paths]
+    
+    # Compare xs as a list: numba may hand back its own list type
+    same = all(tuple(r[:4]) == tuple(expected[:4]) and list(r[4]) == list(expected[4])
+               for r in results)
+    
+    if same and list(expected[4]) == [0.0, expected[0], 2 * expected[0]]:
+        print("✓ Layout kernel: PASSED")
+        return True
+    else:
+        print(f"✗ Layout kernel: FAILED - {results} != {expected}")
+        return False
+
+
+def test_generate_endpoint():
+    """Test POST /generate on a live server: success, gzip and rejected requests."""
+    from server import MAX_BODY_BYTES, ModelerHTTPServer, MyHTTPRequestHandler
+    
+    class QuietHandler(MyHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+    
+    httpd = ModelerHTTPServer(("127.0.0.1", 0), QuietHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    
+    def post(path, body, headers=None, length=None):
+        conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+        conn.putrequest("POST", path, skip_accept_encoding=True)
+        conn.putheader("Content-Length", str(len(body) if length is None else length))
+        for name, value in (headers or {}).items():
+            conn.putheader(name, value)
+        conn.endheaders(body if length is None else None)
+        response = conn.getresponse()
+        result = response.status, response.getheader("Content-Encoding"), response.read()
+        conn.close()
+        return result
+    
+    try:
+        prompt = json.dumps({"prompt": "100000 bedrooms"}).encode()
+        status, encoding, body = post("/generate", prompt)
+        plain_ok = status == 200 and encoding is None and len(json.loads(body)["rooms"]) == 20
+        
+        status, encoding, body = post("/generate", prompt, {"Accept-Encoding": "gzip"})
+        gzip_ok = status == 200 and encoding == "gzip" and "rooms" in json.loads(gzip.decompress(body))
+        
+        # q=0 explicitly refuses gzip
+        status, encoding, body = post("/generate", prompt, {"Accept-Encoding": "gzip;q=0, identity"})
+        gzip_ok = gzip_ok and status == 200 and encoding is None and "rooms" in json.loads(body)
+        
+        rejected = [
+            post("/generate", b'{"prompt": 5}')[0] == 400,
+            post("/generate", b"not json")[0] == 400,
+            post("/generate", b"", length=-1)[0] == 400,
+            post("/generate", b"", length=MAX_BODY_BYTES + 1)[0] == 413,
+            post("/missing", prompt)[0] == 404,
+        ]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    
+    if plain_ok and gzip_ok and all(rejected):
+        print("✓ Generate endpoint: PASSED")
+        return True
+    else:
+        print(f"✗ Generate endpoint: FAILED - plain={plain_ok}, gzip={gzip_ok}, rejected={rejected}")
+        return False
+
+
+def test_static_gzip():
+    """Test gzip-encoded static files, q=0 refusal and If-Modified-Since revalidation."""
+    from server import ModelerHTTPServer, MyHTTPRequestHandler
+    
+    class QuietHandler(MyHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+    
+    directory = os.path.dirname(os.path.abspath(__file__))
+    handler = functools.partial(QuietHandler, directory=directory)
+    httpd = ModelerHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    
+    def get(headers):
+        conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+        conn.request("GET", "/README.md", headers=headers)
+        response = conn.getresponse()
+        result = response.status, response.getheaders(), response.read()
+        conn.close()
+        return result
+    
+    try:
+        status, headers, body = get({"Accept-Encoding": "gzip"})
+        headers = dict(headers)
+        with open(os.path.join(directory, "README.md"), "rb") as f:
+            full_ok = (status == 200 and headers.get("Content-Encoding") == "gzip"
+                       and gzip.decompress(body) == f.read())
+        
+        status, _, body = get({"Accept-Encoding": "gzip",
+                               "If-Modified-Since": headers.get("Last-Modified", "")})
+        cached_ok = status == 304 and body == b""
+        
+        status, _, _ = get({"Accept-Encoding": "gzip",
+                            "If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})
+        stale_ok = status == 200
+        
+        status, refused_headers, body = get({"Accept-Encoding": "gzip;q=0"})
+        with open(os.path.join(directory, "README.md"), "rb") as f:
+            refused_ok = (status == 200 and "Content-Encoding" not in dict(refused_headers)
+                          and body == f.read())
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    
+    if full_ok and cached_ok and stale_ok and refused_ok:
+        print("✓ Static gzip: PASSED")
+        return True
+    else:
+        print(f"✗ Static gzip: FAILED - full={full_ok}, cached={cached_ok}, stale={stale_ok}, refused={refused_ok}")
+        return False
+
+
 if __name__ == "__main__":
     print("Running 3D Modeler Pro Test Suite\n")
     print("=" * 50)
@@ -156,7 +432,16 @@ if __name__ == "__main__":
         test_basic_generation,
         test_multi_room,
         test_style_detection,
-        test_architectural_rules
+        test_architectural_rules,
+        test_output_format,
+        test_keyword_boundaries,
+        test_find_keywords,
+        test_wall_table,
+        test_json_writer,
+        test_prompt_cache,
+        test_layout_kernel,
+        test_generate_endpoint,
+        test_static_gzip
     ]
     
     passed = 0